@@ -0,0 +1,110 @@
+""" Measure whether flattening a page in a process pool could pay off
+
+Usage: python benchmark.py
+
+For pages of BATCH_SIZE responses to forms of a growing number of
+questions, prints the time it takes to flatten the page serially, and the
+time the parent process alone would spend moving it through a process
+pool, which it does serially whatever the number of cores:
+
+    floor    pickling the items to the workers and unpickling the
+             flattened items back
+    results  unpickling the flattened items only, for workers that fetch
+             the pages themselves
+
+A pool can't flatten a page faster than its floor, so it can only pay off
+where the floor is well below the serial time.
+
+Output on a single core machine, python 2.7 (no multi-core timings were
+taken, the columns don't depend on the number of cores):
+
+    1000 responses per page, best of 10
+     questions     serial      floor    results
+             1     0.003s     0.004s     0.002s
+            10     0.019s     0.021s     0.012s
+            50     0.103s     0.134s     0.070s
+           100     0.183s     0.299s     0.157s
+           200     0.427s     0.879s     0.309s
+
+The floor is 1.1x to 2.1x the serial time, so passing the items through
+a pool is always slower, hence prepare_results is serial. With workers
+fetching the pages, unpickling the results alone is still 0.6x to 0.9x
+the serial time, before the cost of the pool itself.
+"""
+import timeit
+import cPickle
+from typeform import prepare_results, BATCH_SIZE
+
+FORM = {'value': 'abc', 'name': 'Benchmark Survey'}
+QUESTIONS = [1, 10, 50, 100, 200]
+REPEAT = 10
+
+
+def generate_page(questions):
+    """ A page of BATCH_SIZE responses, each answering all the questions """
+    answers = [{
+        'field': {
+            'id': 'question{}_id'.format(q),
+            'type': 'multiple_choice',
+        },
+        'type': 'choice',
+        'choice': {
+            'label': 'Agree'
+        }
+    }
+        for q in range(questions)
+    ]
+
+    items = [{
+        'token': x,
+        'metadata': {'someData': 'data'},
+        'answers': [dict(a) for a in answers]
+    }
+        for x in range(BATCH_SIZE)
+    ]
+
+    return {'items': items}
+
+
+def best(func, questions):
+    """ Best time (in seconds) of `func` over REPEAT fresh pages """
+    times = []
+    for _ in range(REPEAT):
+        page = generate_page(questions)
+        flattened = prepare_results(FORM, generate_page(questions))
+        # the pool's connections pickle with cPickle's highest protocol
+        flattened = cPickle.dumps(flattened, cPickle.HIGHEST_PROTOCOL)
+
+        start = timeit.default_timer()
+        func(page, flattened)
+        times.append(timeit.default_timer() - start)
+    return min(times)
+
+
+def serial(page, flattened):
+    prepare_results(FORM, page)
+
+
+def floor(page, flattened):
+    cPickle.dumps(page['items'], cPickle.HIGHEST_PROTOCOL)
+    cPickle.loads(flattened)
+
+
+def results(page, flattened):
+    cPickle.loads(flattened)
+
+
+def main():
+    print('{} responses per page, best of {}'.format(BATCH_SIZE, REPEAT))
+    print('{:>10} {:>10} {:>10} {:>10}'.format(
+        'questions', 'serial', 'floor', 'results'))
+    for questions in QUESTIONS:
+        print('{:>10} {:>9.3f}s {:>9.3f}s {:>9.3f}s'.format(
+            questions,
+            best(serial, questions),
+            best(floor, questions),
+            best(results, questions)))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,10 @@
 import unittest
 from mock import MagicMock
+from ratelimit import RateLimitException
+from itertools import count
+import threading
 from typeform import *
+from typeform.typeform import _limiters
 
 OPTIONS = {
     # no-op logger during tests
@@ -43,6 +47,9 @@ class TestMockResponse(unittest.TestCase):
 
 class TestTypeform(unittest.TestCase):
 
+    def setUp(self):
+        _limiters.clear()
+
     def test_destination(self):
         source = {'key': 'TypeformAPIKey'}
         Typeform(source, OPTIONS)
@@ -325,6 +332,226 @@ class TestTypeform(unittest.TestCase):
             params=expected_params
         )
 
+    def test_shared_session(self):
+        source = {
+            'access_token': 'someToken',
+            'forms': [{'value': 'abc', 'name': 'Test Survey'}]
+        }
+
+        res = generate_form_results(1)
+        session = MagicMock()
+        session.get = MagicMock(return_value=MockResponse(res, 200))
+        requests.get = MagicMock()
+
+        options = dict(OPTIONS, session=session)
+        stream = Typeform(source, options)
+        stream.read()
+
+        self.assertEqual(session.get.call_count, 1)
+        self.assertEqual(requests.get.call_count, 0)
+
+    def test_limiter_per_token(self):
+        self.assertIs(get_limiter('token1'), get_limiter('token1'))
+        self.assertIsNot(get_limiter('token1'), get_limiter('token2'))
+
+        # a frozen clock, so all the calls fall in the same period
+        clock = MagicMock(return_value=0)
+        exhausted = get_limiter('exhaustedToken', clock)
+        fresh = get_limiter('freshToken', clock)
+
+        # use up the budget of one token
+        for _ in range(NUM_OF_CALLS):
+            exhausted()
+        self.assertRaises(RateLimitException, exhausted)
+
+        # the other tokens aren't throttled by it
+        for _ in range(NUM_OF_CALLS):
+            fresh()
+
+        # the budget is back in the next period
+        clock.return_value = LIMIT_PERIOD_SEC
+        exhausted()
+
+
+class TestBatchRunner(unittest.TestCase):
+
+    def setUp(self):
+        _limiters.clear()
+
+    def test_run(self):
+        sources = [
+            {
+                'access_token': 'token{}'.format(i),
+                'forms': [
+                    {'value': 'abc', 'name': 'Survey {}'.format(i)},
+                    {'value': 'edf', 'name': 'Survey {}'.format(i)}
+                ]
+            }
+            for i in range(3)
+        ]
+
+        def get(url, headers, params):
+            return MockResponse(generate_form_results(1), 200)
+
+        session = MagicMock()
+        session.get = MagicMock(side_effect=get)
+
+        runner = BatchRunner(sources, OPTIONS, workers=2, session=session)
+        batches = list(runner.run())
+
+        # one batch for each form of each source
+        self.assertEqual(len(batches), 6)
+        self.assertEqual(session.get.call_count, 6)
+        self.assertEqual(runner.errors, [])
+
+        tables = sorted(results[0]['__table'] for _, results in batches)
+        expected = sorted(['Survey 0', 'Survey 1', 'Survey 2'] * 2)
+        self.assertEqual(tables, expected)
+
+    def test_run_with_errors(self):
+        sources = [
+            {
+                'access_token': 'goodToken',
+                'forms': [{'value': 'abc', 'name': 'Test Survey'}]
+            },
+            {
+                'access_token': 'badToken',
+                'forms': [{'value': 'edf', 'name': 'Test Survey'}]
+            }
+        ]
+
+        def get(url, headers, params):
+            # not a RequestException, so it fails without backing off
+            if 'badToken' in headers['authorization']:
+                raise ValueError('bad token')
+            return MockResponse(generate_form_results(1), 200)
+
+        session = MagicMock()
+        session.get = MagicMock(side_effect=get)
+
+        runner = BatchRunner(sources, OPTIONS, workers=2, session=session)
+        batches = list(runner.run())
+
+        # the failing source doesn't abort the other one
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(batches[0][0], sources[0])
+        self.assertEqual(len(runner.errors), 1)
+        self.assertEqual(runner.errors[0][0], sources[1])
+
+        # the errors are of the last run only
+        list(runner.run())
+        self.assertEqual(len(runner.errors), 1)
+
+    def test_run_round_robin(self):
+        # a source with many pages, and a few with a page per form
+        sources = [{
+            'access_token': 'bigToken',
+            'forms': [{'value': 'abc', 'name': 'big'}]
+        }] + [
+            {
+                'access_token': 'smallToken{}'.format(i),
+                'forms': [
+                    {'value': 'abc', 'name': 'small{}'.format(i)},
+                    {'value': 'edf', 'name': 'small{}'.format(i)}
+                ]
+            }
+            for i in range(3)
+        ]
+
+        pages = {'bigToken': 3}
+
+        def get(url, headers, params):
+            token = headers['authorization'].split()[1]
+            if token != 'bigToken':
+                return MockResponse(generate_form_results(1), 200)
+
+            # full pages until the last one
+            pages[token] -= 1
+            size = BATCH_SIZE if pages[token] > 0 else 1
+            return MockResponse(generate_form_results(size), 200)
+
+        session = MagicMock()
+        session.get = MagicMock(side_effect=get)
+
+        # a clock moving a whole period on every call, so the scheduling
+        # isn't affected by the rate limits
+        for source in sources:
+            clock = count(0, LIMIT_PERIOD_SEC).next
+            get_limiter(source['access_token'], clock)
+
+        runner = BatchRunner(sources, OPTIONS, workers=1, session=session)
+        tables = [results[0]['__table'] for _, results in runner.run()]
+
+        # the big source is read in turns with the others, not before them
+        expected = ['big', 'small0', 'small1', 'small2'] * 2 + ['big']
+        self.assertEqual(tables, expected)
+
+    def test_run_invalid_source(self):
+        sources = [
+            {
+                'access_token': 'goodToken',
+                'forms': [{'value': 'abc', 'name': 'Test Survey'}]
+            },
+            {
+                'access_token': 'badToken',
+                'lastTimeSucceed': 'not a date',
+                'forms': [{'value': 'edf', 'name': 'Test Survey'}]
+            }
+        ]
+
+        def get(url, headers, params):
+            return MockResponse(generate_form_results(1), 200)
+
+        session = MagicMock()
+        session.get = MagicMock(side_effect=get)
+
+        runner = BatchRunner(sources, OPTIONS, workers=2, session=session)
+        batches = list(runner.run())
+
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(batches[0][0], sources[0])
+        self.assertEqual(len(runner.errors), 1)
+        self.assertEqual(runner.errors[0][0], sources[1])
+        self.assertIsInstance(runner.errors[0][1], ValueError)
+
+        # without any valid source the run ends right away
+        runner = BatchRunner(sources[1:], OPTIONS, session=session)
+        self.assertEqual(list(runner.run()), [])
+        self.assertEqual(len(runner.errors), 1)
+
+    def test_invalid_workers(self):
+        self.assertRaises(ValueError, BatchRunner, [], OPTIONS, workers=0,
+                          session=MagicMock())
+
+    def test_run_closed_early(self):
+        sources = [
+            {
+                'access_token': 'closedToken{}'.format(i),
+                'forms': [{'value': 'abc', 'name': 'Test Survey'}]
+            }
+            for i in range(4)
+        ]
+
+        # endless full pages
+        def get(url, headers, params):
+            return MockResponse(generate_form_results(BATCH_SIZE), 200)
+
+        session = MagicMock()
+        session.get = MagicMock(side_effect=get)
+
+        threads = threading.active_count()
+        runner = BatchRunner(sources, OPTIONS, workers=2, session=session)
+        batches = runner.run()
+        next(batches)
+        batches.close()
+
+        # all the workers are gone
+        self.assertEqual(threading.active_count(), threads)
+
+    def test_run_no_sources(self):
+        runner = BatchRunner([], OPTIONS, session=MagicMock())
+        self.assertEqual(list(runner.run()), [])
+
 
 def generate_form_results(size):
     responses = [{
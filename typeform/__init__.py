@@ -1,4 +1,5 @@
 from typeform import *
+from batch import BatchRunner
 AUTH_URL = 'https://api.typeform.com/oauth/authorize'
 REFRESH_URL = 'https://api.typeform.com/oauth/token'
 
@@ -0,0 +1,189 @@
+from heapq import heappush, heappop
+from itertools import count
+from threading import Thread, Lock, Condition, Event
+from time import time
+from Queue import Queue, Empty, Full
+from ratelimit import RateLimitException
+from requests.adapters import HTTPAdapter
+from typeform import Typeform
+import requests
+
+DEFAULT_WORKERS = 8
+# how often blocked threads wake up to check whether the run was stopped
+POLL_SEC = 0.1
+
+
+class BatchRunner(object):
+    """ Drive many Typeform sources (one per account) in a single process
+
+    All the streams share one HTTP connection pool, while each access token
+    keeps its own rate budget (see `get_limiter`). Streams are scheduled
+    round-robin, one page at a time, so a large account can't starve the
+    others. A stream over its token's budget is put aside until the budget
+    resets, leaving the workers free to serve the other accounts.
+
+    Usage:
+
+        runner = BatchRunner(sources, options)
+        for source, results in runner.run():
+            ...
+
+    Failing streams are dropped and reported in `runner.errors` as
+    (source, exception) tuples instead of aborting the whole batch.
+    """
+
+    def __init__(self, sources, options, workers=DEFAULT_WORKERS,
+                 session=None):
+        if workers < 1:
+            raise ValueError('workers must be at least 1, got %s' % workers)
+
+        self._workers = workers
+        self._session = session or _build_session(workers)
+        self._options = dict(options, session=self._session,
+                             wait_for_limit=False)
+        self._sources = sources
+        self.errors = []
+
+    def run(self, n=None):
+        """ Read all the streams, yielding (source, results) for each batch """
+        self.errors = []
+        streams = []
+        for source in self._sources:
+            try:
+                streams.append(Typeform(source, self._options))
+            except Exception as e:
+                # e.g. a malformed lastTimeSucceed
+                self.errors.append((source, e))
+
+        if not streams:
+            return
+
+        schedule = _Schedule()
+        for stream in streams:
+            schedule.put(stream)
+
+        # bounded, so workers don't outrun a slow consumer
+        output = Queue(maxsize=self._workers)
+        stop = Event()
+        state = {'active': len(streams)}
+        lock = Lock()
+
+        def emit(batch):
+            """ Put a batch in the output, unless the run was stopped """
+            while not stop.is_set():
+                try:
+                    output.put(batch, timeout=POLL_SEC)
+                    return
+                except Full:
+                    pass
+
+        def done(stream, error=None):
+            if error is not None:
+                self.errors.append((stream.source, error))
+
+            with lock:
+                state['active'] -= 1
+                finished = state['active'] == 0
+
+            if finished:
+                # release all the idle workers and the consumer
+                schedule.close()
+                emit(None)
+
+        def work():
+            while not stop.is_set():
+                stream = schedule.get()
+                if stream is None:
+                    return
+
+                try:
+                    results = stream.read(n)
+                except RateLimitException as e:
+                    # retry once the access token's budget resets
+                    schedule.put(stream, time() + e.period_remaining)
+                    continue
+                except Exception as e:
+                    done(stream, e)
+                    continue
+
+                if results is None:
+                    done(stream)
+                    continue
+
+                emit((stream.source, results))
+                schedule.put(stream, time())
+
+        threads = [Thread(target=work) for _ in range(self._workers)]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        try:
+            while True:
+                # poll, as a blocking get can't be interrupted on python 2
+                try:
+                    batch = output.get(timeout=POLL_SEC)
+                except Empty:
+                    continue
+
+                if batch is None:
+                    break
+                yield batch
+        finally:
+            stop.set()
+            schedule.close()
+
+            # unblock the workers waiting for room in the output
+            while True:
+                try:
+                    output.get_nowait()
+                except Empty:
+                    break
+
+            for thread in threads:
+                thread.join()
+
+
+class _Schedule(object):
+    """ Streams waiting for their next page, by the time they may be read
+
+    Streams with the same time are read in the order they were put, which
+    keeps the scheduling round-robin.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._order = count()
+        self._cond = Condition()
+        self._closed = False
+
+    def put(self, stream, not_before=0):
+        with self._cond:
+            heappush(self._heap, (not_before, next(self._order), stream))
+            self._cond.notify()
+
+    def get(self):
+        """ Wait for the next stream that may be read, None once closed """
+        with self._cond:
+            while not self._closed:
+                timeout = POLL_SEC
+                if self._heap:
+                    wait = self._heap[0][0] - time()
+                    if wait <= 0:
+                        return heappop(self._heap)[2]
+                    timeout = min(wait, timeout)
+                self._cond.wait(timeout)
+            return None
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+def _build_session(workers):
+    """ Create a session with a connection pool sized for the workers """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+    session.mount('https://', adapter)
+    return session
@@ -4,6 +4,8 @@ from backoff import on_exception, expo
 from datetime import datetime, timedelta
 from ratelimit import limits, sleep_and_retry
 from requests.exceptions import RequestException
+from threading import Lock
+from time import time
 import requests
 
 BATCH_SIZE = 1000
@@ -21,6 +23,10 @@ DATE_PARSER_FORMAT = '%Y-%m-%dT%H:%M:%S'
 NUM_OF_CALLS = 2
 LIMIT_PERIOD_SEC = 1
 
+# rate limiters keyed by access token, shared by every stream in the process
+_limiters = {}
+_limiters_lock = Lock()
+
 
 def _log_backoff(details):
     """ Log each time a backoff happened """
@@ -54,6 +60,14 @@ class Typeform(DataSource):
         self._access_token = source.get('access_token')
         self._total = len(self._forms)
 
+        # an optional shared `requests.Session` (e.g. from the BatchRunner),
+        # falls back to the module-level `requests` functions
+        self._session = options.get('session') or requests
+
+        # when False, a request over the access token's rate budget raises
+        # a `RateLimitException` instead of sleeping until it's available
+        self._wait_for_limit = options.get('wait_for_limit', True)
+
     def read(self, n=None):
         if not self._forms:
             # no more data to consume
@@ -101,17 +115,20 @@ class Typeform(DataSource):
         return map(lambda f: dict(name=f.get('title'),
                                   value=f.get('id')), forms)
 
-    # Typeform limits API requests to NUM_OF_CALLS per LIMIT_PERIOD_SEC.
     @on_exception(expo, RequestException, max_tries=5, on_backoff=_log_backoff)
-    @sleep_and_retry
-    @limits(calls=NUM_OF_CALLS, period=LIMIT_PERIOD_SEC)
     def _request(self, url, params=None):
         """ Helper function for issuing GET requests """
+        # take a slot in this access token's rate budget
+        limiter = get_limiter(self._access_token)
+        if self._wait_for_limit:
+            limiter = sleep_and_retry(limiter)
+        limiter()
+
         self.log('Send Typefrom request', url, params)
         headers = {
             'authorization': 'Bearer {}'.format(self._access_token)
         }
-        response = requests.get(url, headers=headers, params=params)
+        response = self._session.get(url, headers=headers, params=params)
         response.raise_for_status()
 
         self.log('Received Typefrom response', response.url)
@@ -191,6 +208,24 @@ def add_item_data(form, item, answers):
     item['__table'] = form['name']
 
 
+def get_limiter(access_token, clock=time):
+    """ Get (or create) the rate limiter of an access token
+
+    Typeform limits API requests to NUM_OF_CALLS per LIMIT_PERIOD_SEC for
+    each account, so streams of different accounts don't throttle each
+    other while streams sharing a token also share its budget. Calling the
+    limiter over the budget raises a `RateLimitException`.
+
+    The `clock` is used only when the limiter is created.
+    """
+    with _limiters_lock:
+        if access_token not in _limiters:
+            limiter = limits(calls=NUM_OF_CALLS, period=LIMIT_PERIOD_SEC,
+                             clock=clock)
+            _limiters[access_token] = limiter(lambda: None)
+        return _limiters[access_token]
+
+
 def get_incval(source):
     """ create incval using lastTimeSucceed if exists """
     if not source.get('lastTimeSucceed'):